@@ -1,6 +1,9 @@
 import datetime
+import sys
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from itertools import chain
+from typing import Iterable, Iterator
 
 from exceptions import MeasurementsAbsentError
 from entities import DayMeasurements, FactForecasts, Substances, Companies
@@ -45,15 +48,32 @@ class DayMeasurementsDataSum:
 
 
 class DataSumReport(ReportInterface):
-    measurements: list[DayMeasurements]
-    report: list[DayMeasurementsDataSum] = []
-
-    def __init__(self, measurements: list[DayMeasurements]):
-        if not measurements:
+    measurements: list[DayMeasurements] | Iterator[DayMeasurements]
+    date: datetime.date | None
+    report: list[DayMeasurementsDataSum]
+
+    def __init__(self, measurements: Iterable[DayMeasurements], date: datetime.date | None = None):
+        """
+        date ограничивает отчет одним днем.
+        Измерения можно передать итератором (DBStorageSQLite.iter_read): тогда они не собираются
+        в память, но iter_report можно пройти только один раз.
+        """
+        if isinstance(measurements, list):
+            if date is not None:
+                measurements = [m for m in measurements if m.date == date]
+            is_empty = not measurements
+        else:
+            rows = (m for m in measurements if date is None or m.date == date)
+            first = next(rows, None)
+            is_empty = first is None
+            measurements = chain((first, ), rows)
+        if is_empty:
             raise MeasurementsAbsentError(
                 'Отсутствуют данные для анализа.'
             )
         self.measurements = measurements
+        self.date = date
+        self.report = []
 
     def _get_measurements_data_sum(self, day_measurements) -> list[MeasurementsDataSum]:
         measurements_data = []
@@ -84,38 +104,23 @@ class DataSumReport(ReportInterface):
                 data_sum = m[index + 1].quantity
         return measurements_data
 
-    def make_report(self):
+    def iter_report(self) -> Iterator[DayMeasurementsDataSum]:
+        """Лениво строит строки отчета, не накапливая их в памяти."""
         for day_measurements in self.measurements:
-            self.report.append(DayMeasurementsDataSum(
+            yield DayMeasurementsDataSum(
                 date=day_measurements.date,
                 company=day_measurements.company,
                 day_measurements=self._get_measurements_data_sum(day_measurements.day_measurements)
-            ))
+            )
+
+    def make_report(self):
+        self.report = list(self.iter_report())
 
     def get_report(self):
         return self.report or None
 
     def _print_to_terminal(self):
-        """Тестовый вывод"""
-        header = [
-            ['', '', ''],
-            ['#', 'date', 'company']
-        ]
-        for m in self.report[0].day_measurements:
-            header[0] += [m.fs.fact_forecasts.name]
-            header[1] += [m.fs.substance.name]
-        body = [None] * len(self.report)
-        for row_index in range(len(self.report)):
-            body[row_index] = []
-            body[row_index].append(str(row_index + 1))
-            body[row_index].append(self.report[row_index].date.strftime('%d/%m/%Y'))
-            body[row_index].append(self.report[row_index].company.name)
-            for column_index in range(len(self.report[row_index].day_measurements)):
-                body[row_index].append(
-                    str(self.report[row_index].day_measurements[column_index].quantity)
-                )
-        width = 10
-        table = header + body
-        for row_data in table:
-            line = ' \t'.join(map(lambda cell: cell.rjust(width), row_data))
-            print(line)
+        """Тестовый вывод. Строки печатаются по мере построения отчета."""
+        # Импорт внутри метода: exporters импортирует analytics, а таблицу рисует один класс.
+        from exporters import TerminalReportExporter
+        TerminalReportExporter().export(self.report or self.iter_report(), sys.stdout)
@@ -0,0 +1,100 @@
+import os
+import pickle
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable
+
+from analytics import ReportInterface
+from entities import DayMeasurements
+from storage import DBStorageInterface
+
+
+class ReportCache:
+    """
+    Кэш готовых отчетов. Ключ - идентификатор хранилища, тип отчета, его параметры
+    и версия данных хранилища, поэтому отчет пересчитывается только после записи в хранилище
+    или при подмене файла БД.
+    Размер ограничен max_size, при переполнении вытесняется давно не запрошенный отчет (LRU).
+    Если задан filename, кэш сохраняется на диск и загружается при создании.
+    """
+    storage: DBStorageInterface
+    max_size: int
+    filename: str | None
+    reports: OrderedDict[tuple, list]
+
+    def __init__(self, storage: DBStorageInterface, max_size: int = 128, filename: str | None = None):
+        if max_size < 1:
+            raise ValueError('Размер кэша должен быть больше нуля.')
+        self.storage = storage
+        self.max_size = max_size
+        self.filename = filename
+        self.reports = OrderedDict()
+        self._load()
+
+    def _get_key(self, report_class: type[ReportInterface], data_version: int, params: dict) -> tuple:
+        frozen_params: tuple[tuple[str, Hashable], ...] = tuple(sorted(params.items()))
+        return self.storage.storage_id, report_class.__name__, frozen_params, data_version
+
+    def _load(self):
+        """Загружает кэш с диска. Поврежденный файл игнорируется."""
+        if not self.filename or not os.path.isfile(self.filename):
+            return
+        try:
+            with open(self.filename, 'rb') as file:
+                reports = pickle.load(file)
+        except Exception:
+            # Кроме поврежденного файла сюда попадают ссылки на переименованные классы и модули
+            # (AttributeError, ModuleNotFoundError): кэш просто строится заново.
+            return
+        if not isinstance(reports, OrderedDict):
+            return
+        for key, report in list(reports.items())[-self.max_size:]:
+            self.reports[key] = report
+
+    def _dump(self):
+        """Атомарно сохраняет кэш на диск."""
+        if not self.filename:
+            return
+        tmp_filename = f'{self.filename}.tmp'
+        with open(tmp_filename, 'wb') as file:
+            pickle.dump(self.reports, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_filename, self.filename)
+
+    def _invalidate(self, data_version: int):
+        """Удаляет отчеты, построенные по другому хранилищу или устаревшим версиям данных."""
+        storage_id = self.storage.storage_id
+        stale_keys = [key for key in self.reports if (key[0], key[-1]) != (storage_id, data_version)]
+        for key in stale_keys:
+            del self.reports[key]
+
+    def _put(self, key: tuple, report: list):
+        self.reports[key] = report
+        self.reports.move_to_end(key)
+        while len(self.reports) > self.max_size:
+            self.reports.popitem(last=False)
+
+    def get_report(
+            self,
+            report_class: type[ReportInterface],
+            load_measurements: Callable[[], Iterable[DayMeasurements]],
+            **params
+    ) -> list | None:
+        """
+        Возвращает отчет из кэша. При промахе загружает измерения через load_measurements,
+        строит отчет и сохраняет его в кэш.
+        """
+        data_version = self.storage.data_version
+        key = self._get_key(report_class, data_version, params)
+        if key in self.reports:
+            self.reports.move_to_end(key)
+            return self.reports[key]
+        self._invalidate(data_version)
+        report = report_class(load_measurements(), **params)
+        report.make_report()
+        self._put(key, report.get_report())
+        self._dump()
+        return self.reports[key]
+
+    def clear(self):
+        self.reports.clear()
+        if self.filename and os.path.isfile(self.filename):
+            os.remove(self.filename)
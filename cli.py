@@ -0,0 +1,185 @@
+"""
+Командная строка приложения.
+
+Модули хранилищ, аналитики и экспорта импортируются внутри обработчиков команд,
+поэтому каждая команда платит только за то, что использует:
+report не загружает openpyxl, а запуск без команды не загружает даже sqlite3.
+"""
+import argparse
+import sys
+import time
+import traceback
+from typing import Iterable
+
+
+def _parse_date(value: str):
+    import datetime
+    return datetime.date.fromisoformat(value)
+
+
+def _ingest(args) -> int:
+    import os
+    from storage import ExcelStorage, ExcelDimensions, DBStorageSQLite
+    db = DBStorageSQLite(args.db)
+    if args.watch:
+        from daemon import IngestDaemon
+        IngestDaemon(args.paths[0], db, poll_interval=args.interval).run()
+        return 0
+    if not args.append:
+        db.clear()
+    dimensions = ExcelDimensions()
+    for filename in args.paths:
+        measurements = ExcelStorage(filename, dimensions=dimensions).read()
+        if args.append:
+            db.delete_source(os.path.abspath(filename))
+        db.add(measurements)
+        print(f'Загружен {filename}: {len(measurements)} строк.')
+    return 0
+
+
+def _get_report(args) -> Iterable:
+    from storage import DBStorageSQLite
+    from analytics import DataSumReport
+    db = DBStorageSQLite(args.db)
+    if args.cache:
+        from cache import ReportCache
+        return ReportCache(db, filename=args.cache).get_report(
+            DataSumReport, lambda: db.iter_read(date=args.date), date=args.date
+        )
+    # Измерения читаются курсором по одному дню: первая строка отчета выводится сразу,
+    # а память не зависит от размера БД.
+    report = DataSumReport(db.iter_read(date=args.date), date=args.date)
+    return report.iter_report()
+
+
+def _report(args) -> int:
+    from exporters import TerminalReportExporter
+    TerminalReportExporter().export(_get_report(args), sys.stdout)
+    return 0
+
+
+def _export(args) -> int:
+    from exporters import CSVReportExporter, JSONLinesReportExporter
+    exporter_class = {'csv': CSVReportExporter, 'jsonl': JSONLinesReportExporter}[args.format]
+    if args.output == '-':
+        target = sys.stdout.buffer if args.gzip else sys.stdout
+        exporter_class(compress=args.gzip).export(_get_report(args), target)
+    else:
+        exporter_class(compress=args.gzip or None).export(_get_report(args), args.output)
+    return 0
+
+
+def _measure_import(module: str) -> tuple[float, list[str]]:
+    """
+    Импортирует модуль в отдельном интерпретаторе и возвращает время импорта в мс
+    и список тяжелых модулей, оказавшихся загруженными.
+    """
+    import json
+    import os
+    import subprocess
+    code = (
+        'import json, sys, time\n'
+        'start = time.perf_counter()\n'
+        f'import {module}\n'
+        'elapsed = (time.perf_counter() - start) * 1000\n'
+        f'heavy = [name for name in {HEAVY_MODULES!r} if name in sys.modules]\n'
+        'print(json.dumps([elapsed, heavy]))\n'
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code],
+        capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    ).stdout
+    elapsed, heavy = json.loads(output)
+    return elapsed, heavy
+
+
+# Модули бэкендов, которые не должны загружаться при старте CLI.
+HEAVY_MODULES = ('openpyxl', 'sqlite3', 'storage', 'analytics', 'exporters', 'cache', 'daemon')
+BENCH_IMPORT_MODULES = ('cli', 'analytics', 'storage', 'exporters', 'cache', 'services', 'daemon')
+
+
+def _bench(args) -> int:
+    """
+    Измеряет время импорта модулей и, если указаны, загрузки Excel и построения отчета.
+    Возвращает 1, если импорт cli превысил --max-import-ms или загрузил тяжелый модуль,
+    поэтому команду можно использовать как проверку регрессий времени запуска.
+    """
+    failed = False
+    for module in BENCH_IMPORT_MODULES:
+        elapsed, heavy = _measure_import(module)
+        print(f'import {module}: {elapsed:.1f} мс' + (f', загружены: {", ".join(heavy)}' if heavy else ''))
+        if module == 'cli' and (heavy or elapsed > args.max_import_ms):
+            failed = True
+    if args.excel:
+        from storage import ExcelStorage
+        start = time.perf_counter()
+        measurements = ExcelStorage(args.excel).read()
+        print(f'Разбор {args.excel}: {(time.perf_counter() - start) * 1000:.1f} мс, {len(measurements)} строк')
+    if args.db:
+        from storage import DBStorageSQLite
+        from analytics import DataSumReport
+        start = time.perf_counter()
+        measurements = DBStorageSQLite(args.db).read()
+        print(f'Чтение {args.db}: {(time.perf_counter() - start) * 1000:.1f} мс, {len(measurements)} строк')
+        start = time.perf_counter()
+        DataSumReport(measurements).make_report()
+        print(f'Построение отчета: {(time.perf_counter() - start) * 1000:.1f} мс')
+    if failed:
+        print(f'Регрессия времени запуска: import cli дольше {args.max_import_ms} мс или загружает бэкенды.')
+        return 1
+    return 0
+
+
+def _get_arg_parser() -> argparse.ArgumentParser:
+    arg_parser = argparse.ArgumentParser(description='Загрузка измерений и отчеты по ним.')
+    subparsers = arg_parser.add_subparsers(dest='command', required=True)
+
+    ingest = subparsers.add_parser('ingest', help='загрузить Excel-файлы в SQLite')
+    ingest.add_argument('paths', nargs='+', help='Excel-файлы или папка для --watch')
+    ingest.add_argument('--db', default='sqlite.db', help='файл базы данных SQLite')
+    ingest.add_argument('--append', action='store_true', help='не очищать БД перед загрузкой')
+    ingest.add_argument('--watch', action='store_true', help='следить за папкой и загружать новые файлы')
+    ingest.add_argument('--interval', type=float, default=5.0, help='период опроса папки, с')
+    ingest.set_defaults(handler=_ingest)
+
+    for name, handler, help_text in (
+            ('report', _report, 'вывести отчет по суммам из SQLite'),
+            ('export', _export, 'выгрузить отчет по суммам из SQLite в файл'),
+    ):
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument('--db', default='sqlite.db', help='файл базы данных SQLite')
+        subparser.add_argument('--date', type=_parse_date, help='день отчета в формате ГГГГ-ММ-ДД')
+        subparser.add_argument('--cache', help='файл кэша отчетов')
+        subparser.set_defaults(handler=handler)
+        if name == 'export':
+            subparser.add_argument('--format', choices=('csv', 'jsonl'), default='csv')
+            subparser.add_argument('-o', '--output', default='-', help='файл вывода, по умолчанию stdout')
+            subparser.add_argument('--gzip', action='store_true', help='сжать вывод gzip')
+
+    bench = subparsers.add_parser('bench', help='замерить время запуска и работы')
+    bench.add_argument('--excel', help='Excel-файл для замера разбора')
+    bench.add_argument('--db', help='файл SQLite для замера чтения и отчета')
+    bench.add_argument('--max-import-ms', type=float, default=100.0, help='допустимое время import cli, мс')
+    bench.set_defaults(handler=_bench)
+    return arg_parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _get_arg_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # Получатель вывода закрылся раньше (например, head). stdout перенаправляется в devnull,
+        # чтобы интерпретатор при завершении не пытался снова сбросить буфер в закрытый канал.
+        import os
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    except Exception as error:
+        print('Возникла ошибка при выполнении:', error, file=sys.stderr)
+        traceback.print_exception(error)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
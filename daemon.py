@@ -0,0 +1,172 @@
+import argparse
+import os
+import time
+import traceback
+from dataclasses import dataclass, field
+
+from storage import ExcelStorage, ExcelDimensions, DBStorageInterface, DBStorageSQLite
+
+
+@dataclass
+class IngestStats:
+    """Счетчики пропускной способности и задержки загрузки файлов."""
+    files_ingested: int = 0
+    files_failed: int = 0
+    day_measurements: int = 0
+    total_seconds: float = 0.0
+    last_seconds: float = 0.0
+    max_seconds: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def register(self, day_measurements_count: int, seconds: float):
+        self.files_ingested += 1
+        self.day_measurements += day_measurements_count
+        self.total_seconds += seconds
+        self.last_seconds = seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    @property
+    def uptime(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def avg_seconds(self) -> float:
+        return self.total_seconds / self.files_ingested if self.files_ingested else 0.0
+
+    @property
+    def day_measurements_per_second(self) -> float:
+        return self.day_measurements / self.total_seconds if self.total_seconds else 0.0
+
+    def __str__(self):
+        return (
+            f'файлов: {self.files_ingested}, ошибок: {self.files_failed}, '
+            f'строк: {self.day_measurements}, строк/с: {self.day_measurements_per_second:.1f}, '
+            f'задержка посл./сред./макс.: '
+            f'{self.last_seconds:.3f}/{self.avg_seconds:.3f}/{self.max_seconds:.3f} с, '
+            f'аптайм: {self.uptime:.0f} с'
+        )
+
+
+class IngestDaemon:
+    """
+    Следит за папкой входящих файлов и загружает новые или измененные Excel-файлы в хранилище.
+    Файл загружается, когда его размер и время изменения не менялись два опроса подряд,
+    чтобы не читать недокопированный файл. Перед повторной загрузкой измененного файла
+    его прежние измерения удаляются из хранилища.
+    Справочники переиспользуются между файлами, а измерения каждого файла
+    живут только на время его загрузки, поэтому память не растет со временем работы.
+    """
+    expected_extensions = ('xls', 'xlsx')
+    # Временные файлы-блокировки, которые создает Excel рядом с открытой книгой.
+    lock_file_prefix = '~$'
+
+    inbox: str
+    storage: DBStorageInterface
+    poll_interval: float
+    dimensions: ExcelDimensions
+    stats: IngestStats
+    seen: dict[str, tuple[int, int]]
+    pending: dict[str, tuple[int, int]]
+
+    def __init__(
+            self,
+            inbox: str,
+            storage: DBStorageInterface,
+            poll_interval: float = 5.0
+    ):
+        if not os.path.isdir(inbox):
+            raise FileNotFoundError(f'Папка {inbox} не существует.')
+        self.inbox = inbox
+        self.storage = storage
+        self.poll_interval = poll_interval
+        self.dimensions = ExcelDimensions()
+        self.stats = IngestStats()
+        self.seen = {}
+        self.pending = {}
+        self._running = False
+
+    def _is_excel_file(self, entry: os.DirEntry) -> bool:
+        _, file_extension = os.path.splitext(entry.name)
+        return (
+            entry.is_file()
+            and not entry.name.startswith(self.lock_file_prefix)
+            and file_extension[1:].lower() in self.expected_extensions
+        )
+
+    def _scan(self) -> list[str]:
+        """
+        Возвращает новые и измененные файлы, которые не менялись с прошлого опроса,
+        в порядке изменения. Удаленные файлы забываются, чтобы словари не росли бесконечно.
+        """
+        current: dict[str, tuple[int, int]] = {}
+        with os.scandir(self.inbox) as entries:
+            for entry in entries:
+                if self._is_excel_file(entry):
+                    stat = entry.stat()
+                    current[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        ready = []
+        for path, signature in current.items():
+            if self.seen.get(path) == signature:
+                continue
+            if self.pending.get(path) == signature:
+                ready.append(path)
+            else:
+                self.pending[path] = signature
+        for tracked in (self.seen, self.pending):
+            for path in tracked.keys() - current.keys():
+                del tracked[path]
+        ready.sort(key=lambda path: current[path][0])
+        for path in ready:
+            del self.pending[path]
+            self.seen[path] = current[path]
+        return ready
+
+    def _ingest(self, filename: str):
+        start = time.perf_counter()
+        try:
+            measurements = ExcelStorage(filename, dimensions=self.dimensions).read()
+            self.storage.delete_source(os.path.abspath(filename))
+            self.storage.add(measurements)
+        except Exception as error:
+            self.stats.files_failed += 1
+            print(f'Не удалось загрузить {filename}:', error)
+            traceback.print_exception(error)
+            return
+        self.stats.register(len(measurements), time.perf_counter() - start)
+        print(f'Загружен {filename}. {self.stats}')
+
+    def poll_once(self) -> int:
+        """Загружает все новые и измененные файлы и возвращает их количество."""
+        changed = self._scan()
+        for filename in changed:
+            self._ingest(filename)
+        return len(changed)
+
+    def run(self, max_polls: int | None = None):
+        self._running = True
+        polls = 0
+        while self._running and (max_polls is None or polls < max_polls):
+            self.poll_once()
+            polls += 1
+            if max_polls is None or polls < max_polls:
+                time.sleep(self.poll_interval)
+
+    def stop(self):
+        self._running = False
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Загрузка Excel-файлов из папки в SQLite.')
+    arg_parser.add_argument('inbox', help='папка входящих Excel-файлов')
+    arg_parser.add_argument('db', nargs='?', default='sqlite.db', help='файл базы данных SQLite')
+    arg_parser.add_argument('--interval', type=float, default=5.0, help='период опроса папки, с')
+    args = arg_parser.parse_args()
+    daemon = IngestDaemon(args.inbox, DBStorageSQLite(args.db), poll_interval=args.interval)
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        print('Остановлено.', daemon.stats)
+
+
+if __name__ == '__main__':
+    main()
@@ -60,3 +60,5 @@ class DayMeasurements(Entities):
     date: datetime.date
     company: Companies
     day_measurements: list[Measurements]
+    # Файл, из которого загружены измерения. Позволяет заменить данные файла при повторной загрузке.
+    source: str | None = None
@@ -0,0 +1,189 @@
+import csv
+import gzip
+import io
+import json
+import os
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from itertools import chain
+from typing import IO, Any, Iterable, Iterator
+
+from analytics import DayMeasurementsDataSum
+from exceptions import MeasurementsAbsentError
+
+
+class ReportExporterInterface(ABC):
+
+    @abstractmethod
+    def export(self, report: Iterable[DayMeasurementsDataSum], target: str | os.PathLike | IO) -> int:
+        pass
+
+
+class StreamReportExporter(ReportExporterInterface):
+    """
+    Построчно записывает отчет в файл или файловый объект, не накапливая его в памяти.
+    Путь с расширением .gz или compress=True включает сжатие gzip,
+    для этого файловый объект должен быть открыт в двоичном режиме.
+    """
+    buffer_size = 1024 * 1024
+    encoding = 'utf-8'
+    compress: bool | None
+
+    def __init__(self, compress: bool | None = None):
+        self.compress = compress
+
+    def _is_compressed(self, target: str | os.PathLike | IO) -> bool:
+        if self.compress is not None:
+            return self.compress
+        return isinstance(target, (str, os.PathLike)) and os.fspath(target).endswith('.gz')
+
+    @contextmanager
+    def _open_path(self, path: str | os.PathLike, compressed: bool) -> Iterator[IO[str]]:
+        if not compressed:
+            with open(path, 'w', buffering=self.buffer_size, encoding=self.encoding, newline='') as file:
+                yield file
+            return
+        with open(path, 'wb', buffering=self.buffer_size) as raw_file:
+            with gzip.GzipFile(fileobj=raw_file, mode='wb') as gzip_file:
+                with io.TextIOWrapper(gzip_file, encoding=self.encoding, newline='') as file:
+                    yield file
+
+    @staticmethod
+    def _is_binary(file_object: IO) -> bool:
+        return (
+            isinstance(file_object, (io.RawIOBase, io.BufferedIOBase))
+            or 'b' in str(getattr(file_object, 'mode', ''))
+        )
+
+    @contextmanager
+    def _open_text_wrapper(self, binary_file: IO) -> Iterator[IO[str]]:
+        """
+        Текстовая обертка над двоичным потоком, которая не закрывает сам поток.
+        Обертка отсоединяется и при ошибке: иначе сборщик мусора закрыл бы поток вызывающего.
+        """
+        file = io.TextIOWrapper(binary_file, encoding=self.encoding, newline='')
+        try:
+            yield file
+        finally:
+            try:
+                file.flush()
+            finally:
+                file.detach()
+
+    @contextmanager
+    def _open_file_object(self, file_object: IO, compressed: bool) -> Iterator[IO[str]]:
+        """
+        Файловый объект принадлежит вызывающему, поэтому не закрывается.
+        Двоичные потоки (sys.stdout.buffer, каналы) оборачиваются в текстовые.
+        """
+        if compressed:
+            if isinstance(file_object, io.TextIOBase):
+                raise TypeError(
+                    'Для сжатия gzip файловый объект должен быть открыт в двоичном режиме, '
+                    f'получен текстовый {type(file_object).__name__}.'
+                )
+            with gzip.GzipFile(fileobj=file_object, mode='wb') as gzip_file:
+                with self._open_text_wrapper(gzip_file) as file:
+                    yield file
+        elif self._is_binary(file_object):
+            with self._open_text_wrapper(file_object) as file:
+                yield file
+            file_object.flush()
+        else:
+            yield file_object
+            file_object.flush()
+
+    def _open(self, target: str | os.PathLike | IO):
+        compressed = self._is_compressed(target)
+        if isinstance(target, (str, os.PathLike)):
+            return self._open_path(target, compressed)
+        return self._open_file_object(target, compressed)
+
+    @staticmethod
+    def _get_column_names(day_data_sum: DayMeasurementsDataSum) -> list[str]:
+        return [
+            f'{m.fs.fact_forecasts.name}_{m.fs.substance.name}'
+            for m in day_data_sum.day_measurements
+        ]
+
+    @abstractmethod
+    def _write_header(self, file: IO[str], first_row: DayMeasurementsDataSum):
+        pass
+
+    @abstractmethod
+    def _write_row(self, file: IO[str], column_names: list[str], day_data_sum: DayMeasurementsDataSum):
+        pass
+
+    def export(self, report: Iterable[DayMeasurementsDataSum], target: str | os.PathLike | IO) -> int:
+        """Записывает отчет построчно и возвращает количество записанных строк."""
+        rows = iter(report)
+        first_row = next(rows, None)
+        if first_row is None:
+            raise MeasurementsAbsentError('Нет строк отчета для экспорта.')
+        column_names = self._get_column_names(first_row)
+        rows_count = 0
+        with self._open(target) as file:
+            self._write_header(file, first_row)
+            for day_data_sum in chain((first_row, ), rows):
+                self._write_row(file, column_names, day_data_sum)
+                rows_count += 1
+        return rows_count
+
+
+class CSVReportExporter(StreamReportExporter):
+    delimiter = ','
+    writer: Any
+
+    def _write_header(self, file: IO[str], first_row: DayMeasurementsDataSum):
+        """Создает один csv.writer на весь экспорт."""
+        self.writer = csv.writer(file, delimiter=self.delimiter)
+        self.writer.writerow(['date', 'company'] + self._get_column_names(first_row))
+
+    def _write_row(self, file: IO[str], column_names: list[str], day_data_sum: DayMeasurementsDataSum):
+        self.writer.writerow(
+            [day_data_sum.date.isoformat(), day_data_sum.company.name]
+            + [m.quantity for m in day_data_sum.day_measurements]
+        )
+
+
+class JSONLinesReportExporter(StreamReportExporter):
+
+    def _write_header(self, file: IO[str], first_row: DayMeasurementsDataSum):
+        """В JSON Lines заголовка нет, каждая строка описывает себя сама."""
+
+    def _write_row(self, file: IO[str], column_names: list[str], day_data_sum: DayMeasurementsDataSum):
+        line = json.dumps(
+            {
+                'date': day_data_sum.date.isoformat(),
+                'company': day_data_sum.company.name,
+                'totals': dict(zip(
+                    column_names,
+                    (m.quantity for m in day_data_sum.day_measurements)
+                )),
+            },
+            ensure_ascii=False
+        )
+        file.write(line + '\n')
+
+
+class TerminalReportExporter(StreamReportExporter):
+    """Выводит отчет выровненной таблицей с двухстрочным заголовком."""
+    width = 10
+    row_number: int
+
+    def _write_line(self, file: IO[str], row_data: list[str]):
+        file.write(' \t'.join(map(lambda cell: cell.rjust(self.width), row_data)) + '\n')
+
+    def _write_header(self, file: IO[str], first_row: DayMeasurementsDataSum):
+        self.row_number = 0
+        columns = first_row.day_measurements
+        self._write_line(file, ['', '', ''] + [m.fs.fact_forecasts.name for m in columns])
+        self._write_line(file, ['#', 'date', 'company'] + [m.fs.substance.name for m in columns])
+
+    def _write_row(self, file: IO[str], column_names: list[str], day_data_sum: DayMeasurementsDataSum):
+        self.row_number += 1
+        self._write_line(
+            file,
+            [str(self.row_number), day_data_sum.date.strftime('%d/%m/%Y'), day_data_sum.company.name]
+            + [str(m.quantity) for m in day_data_sum.day_measurements]
+        )
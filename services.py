@@ -1,5 +1,70 @@
-from storage import ExcelStorage, DBStorageSQLite
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable
+
+from storage import ExcelStorage, DBStorageSQLite, StorageInterface
 from analytics import DataSumReport
+from entities import DayMeasurements
+from exceptions import MeasurementsAbsentError
+
+
+@dataclass
+class StorageSaveResult:
+    storage: StorageInterface
+    elapsed: float
+    error: Exception | None = None
+
+    @property
+    def is_success(self) -> bool:
+        return self.error is None
+
+
+def _save_to_storage(storage: StorageInterface, data: list[DayMeasurements]) -> StorageSaveResult:
+    """
+    Сохраняет копию измерений: хранилища проставляют сущностям свои db_pk,
+    и общие объекты перепутали бы ключи разных хранилищ.
+    Копирование не входит в замеренное время записи.
+    """
+    data = copy.deepcopy(data)
+    start = time.perf_counter()
+    try:
+        storage.add(data)
+    except Exception as error:
+        return StorageSaveResult(storage=storage, elapsed=time.perf_counter() - start, error=error)
+    return StorageSaveResult(storage=storage, elapsed=time.perf_counter() - start)
+
+
+def save_to_storages(
+        measurements: Iterable[DayMeasurements],
+        storages: list[StorageInterface],
+        max_workers: int | None = None
+) -> list[StorageSaveResult]:
+    """
+    Параллельно сохраняет одни и те же измерения во все хранилища.
+    Ошибка одного хранилища не прерывает запись в остальные и возвращается в его результате.
+    Результаты идут в порядке storages.
+    Каждое хранилище пишется в своем потоке, поэтому один экземпляр нельзя передать дважды,
+    а DBStorageSQLite и DBStorageShardedSQLite должны быть созданы с check_same_thread=False.
+    Нарушение этих условий проверяется до начала записи.
+    """
+    if len({id(storage) for storage in storages}) != len(storages):
+        raise ValueError('Одно и то же хранилище передано несколько раз.')
+    for storage in storages:
+        if getattr(storage, 'check_same_thread', False):
+            raise ValueError(
+                f'{type(storage).__name__} создано с check_same_thread=True и не может писаться '
+                'в потоке пула. Создайте его с check_same_thread=False.'
+            )
+    data = list(measurements)
+    if not data:
+        raise MeasurementsAbsentError('Нет измерений для сохранения.')
+    if not storages:
+        return []
+    with ThreadPoolExecutor(max_workers=max_workers or len(storages)) as executor:
+        futures = [executor.submit(_save_to_storage, storage, data) for storage in storages]
+    return [future.result() for future in futures]
 
 
 def run_test_task():
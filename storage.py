@@ -1,8 +1,12 @@
 import datetime
+import os
 import sqlite3
+import urllib.parse
+import uuid
 from abc import ABC, abstractmethod
-
-from openpyxl import load_workbook
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterator
 
 from entities import (
     DayMeasurements, Measurements, Companies, FactForecasts, Substances, Datas, FSDs
@@ -42,6 +46,16 @@ class DBStorageMixin(ABC):
 
 class DBStorageInterface(StorageInterface, DBStorageMixin):
 
+    @property
+    @abstractmethod
+    def data_version(self) -> int:
+        pass
+
+    @property
+    @abstractmethod
+    def storage_id(self) -> str:
+        pass
+
     @abstractmethod
     def _get_db_settings(self):
         pass
@@ -66,6 +80,10 @@ class DBStorageInterface(StorageInterface, DBStorageMixin):
     def delete(self, pk: int) -> bool:
         pass
 
+    @abstractmethod
+    def delete_source(self, source: str) -> int:
+        pass
+
 
 class ExcelParserInterface(ABC):
 
@@ -84,6 +102,8 @@ class ExcelOpenpyxlParser(ExcelParserInterface):
 
     def _connect(self):
         """Подключается к активному листу в файле."""
+        # openpyxl импортируется только при разборе файла, чтобы не замедлять запуск команд без Excel.
+        from openpyxl import load_workbook
         workbook = load_workbook(self.filename, read_only=True, data_only=True)
         self.worksheet = workbook.active
 
@@ -165,16 +185,31 @@ class ExcelOpenpyxlParser(ExcelParserInterface):
         return self.table
 
 
+@dataclass
+class ExcelDimensions:
+    """
+    Справочники, найденные при разборе Excel-файлов.
+    Передаются в несколько ExcelStorage, чтобы одни и те же сущности
+    (и их db_pk) переиспользовались между файлами.
+    """
+    companies: list[Companies] = field(default_factory=list)
+    fact_forecasts: list[FactForecasts] = field(default_factory=list)
+    substances: list[Substances] = field(default_factory=list)
+    datas: list[Datas] = field(default_factory=list)
+    fsds: list[FSDs] = field(default_factory=list)
+
+
 class ExcelStorage(StorageInterface):
     parser = ExcelOpenpyxlParser
 
-    measurements: list[DayMeasurements] = []
-    companies: list[Companies] = []
-    fact_forecasts: list[FactForecasts] = []
-    substances: list[Substances] = []
-    datas: list[Datas] = []
-    fsds: list[FSDs] = []
-    table: list[list[str]] = []
+    measurements: list[DayMeasurements]
+    dimensions: ExcelDimensions
+    companies: list[Companies]
+    fact_forecasts: list[FactForecasts]
+    substances: list[Substances]
+    datas: list[Datas]
+    fsds: list[FSDs]
+    table: list[list[str]]
 
     company_column_index = 1
     fact_forecast_row_index = 0
@@ -184,8 +219,16 @@ class ExcelStorage(StorageInterface):
     start_row_index = 3
     start_column_index = 2
 
-    def __init__(self, filename):
+    def __init__(self, filename, dimensions: ExcelDimensions | None = None):
         self.filename = self._check_excel_file(filename)
+        self.dimensions = dimensions if dimensions is not None else ExcelDimensions()
+        self.companies = self.dimensions.companies
+        self.fact_forecasts = self.dimensions.fact_forecasts
+        self.substances = self.dimensions.substances
+        self.datas = self.dimensions.datas
+        self.fsds = self.dimensions.fsds
+        self.measurements = []
+        self.table = []
 
     @staticmethod
     def _check_excel_file(filename):
@@ -295,7 +338,8 @@ class ExcelStorage(StorageInterface):
                     db_pk=None,
                     date=self.__get_fake_date(row_index),
                     company=self._get_or_create_company(row_index),
-                    day_measurements=self._get_day_measurements(row_index)
+                    day_measurements=self._get_day_measurements(row_index),
+                    source=os.path.abspath(self.filename)
                 )
             )
 
@@ -305,8 +349,10 @@ class ExcelStorage(StorageInterface):
     def read(self) -> list[DayMeasurements]:
         """Читает из Excel-файла и возвращает сущность Measurements."""
         parser = self.parser(self.filename)
+        self.measurements = []
         self.table = parser.get_table()
         self._table_to_measurements()
+        self.table = []
         return self.measurements
 
     def update(self, data: list[DayMeasurements]) -> bool:
@@ -320,23 +366,95 @@ class ExcelStorage(StorageInterface):
 
 
 class DBStorageSQLite(DBStorageInterface):
+    meta_table_name = 'storagemeta'
+
     db_name: str
+    check_same_thread: bool
+    read_only: bool
+    generation: str | None
     conn: sqlite3.Connection
     cur: sqlite3.Cursor
     data: list[DayMeasurements] | None
 
     def _init_connection(self, foreign_keys: bool):
+        database = self.db_name
+        if self.read_only:
+            database = f'file:{urllib.parse.quote(os.path.abspath(self.db_name))}?mode=ro'
         self.conn = sqlite3.connect(
-            self.db_name,
-            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+            database,
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            check_same_thread=self.check_same_thread,
+            uri=self.read_only
         )
         switcher = 'ON' if foreign_keys else 'OFF'
         self.conn.execute(f'PRAGMA foreign_keys = {switcher}')
         self.cur = self.conn.cursor()
 
-    def __init__(self, db_name: str):
+    def __init__(self, db_name: str, check_same_thread: bool = True, read_only: bool = False):
+        """
+        check_same_thread=False разрешает передать хранилище в другой поток,
+        например в save_to_storages. Блокировок нет: одновременно экземпляр
+        должен использовать только один поток.
+        read_only=True открывает существующий файл только для чтения: таблица storagemeta
+        не создается и блокировка записи не берется.
+        """
         self.db_name = db_name
+        self.check_same_thread = check_same_thread
+        self.read_only = read_only
         self._init_connection(foreign_keys=True)
+        self.generation = self._read_generation() if read_only else self._get_or_create_generation()
+
+    def _read_generation(self) -> str | None:
+        """Токен создания файла БД без записи; None, если его еще нет."""
+        sql = 'SELECT count(*) FROM sqlite_schema WHERE type="table" AND name=?;'
+        self.cur.execute(sql, (self.meta_table_name, ))
+        if not self.cur.fetchone()[0]:
+            return None
+        self.cur.execute(f'SELECT generation FROM {self.meta_table_name};')
+        row = self.cur.fetchone()
+        return row[0] if row else None
+
+    def _get_or_create_generation(self) -> str:
+        """
+        Случайный токен, записываемый при создании файла БД.
+        Отличает пересозданный файл с тем же путем, у которого user_version снова начинается с нуля.
+        """
+        sql = f'CREATE TABLE IF NOT EXISTS {self.meta_table_name}(generation TEXT NOT NULL);'
+        self.cur.execute(sql)
+        self.cur.execute(f'SELECT generation FROM {self.meta_table_name};')
+        row = self.cur.fetchone()
+        if row is None:
+            row = (uuid.uuid4().hex, )
+            self.cur.execute(f'INSERT INTO {self.meta_table_name}(generation) VALUES(?);', row)
+        self.conn.commit()
+        return row[0]
+
+    @property
+    def storage_id(self) -> str:
+        """Идентификатор конкретного файла БД: путь и токен его создания."""
+        return f'{os.path.realpath(self.db_name)}#{self.generation}'
+
+    @property
+    def data_version(self) -> int:
+        """Счетчик версий данных. Увеличивается при каждой записи в БД."""
+        self.cur.execute('PRAGMA user_version;')
+        return self.cur.fetchone()[0]
+
+    def _bump_data_version(self) -> int:
+        """
+        Увеличивает счетчик версий данных. Хранится в заголовке файла БД
+        (user_version), поэтому виден всем подключениям и переживает clear().
+        Чтение и запись счетчика выполняются в одной транзакции записи: в уже открытой
+        или в BEGIN IMMEDIATE, поэтому два писателя не назначат одну и ту же версию.
+        Возвращает новую версию.
+        """
+        if not self.conn.in_transaction:
+            self.cur.execute('BEGIN IMMEDIATE;')
+        self.cur.execute('PRAGMA user_version;')
+        version = self.cur.fetchone()[0] + 1
+        self.cur.execute(f'PRAGMA user_version = {version};')
+        self.conn.commit()
+        return version
 
     def _get_db_settings(self):
         """Не реализовано. Импорт настроек БД из конфига settings.py."""
@@ -404,17 +522,28 @@ class DBStorageSQLite(DBStorageInterface):
         sql += 'id INTEGER PRIMARY KEY AUTOINCREMENT,'
         sql += 'date DATE,'
         sql += 'company_id INTEGER,'
+        sql += 'source TEXT,'
         sql += f'FOREIGN KEY(company_id) REFERENCES {Companies.get_db_name()}(id)'
         sql += ');'
         self.cur.execute(sql)
+        self._add_column_source()
         self.conn.commit()
 
-    def _create_tables(self):
+    def _add_column_source(self):
+        """Добавляет столбец source в БД, созданные до его появления."""
+        self.cur.execute(f'PRAGMA table_info({DayMeasurements.get_db_name()});')
+        if 'source' not in (column[1] for column in self.cur.fetchall()):
+            self.cur.execute(f'ALTER TABLE {DayMeasurements.get_db_name()} ADD COLUMN source TEXT;')
+
+    def _create_dimension_tables(self):
         self._create_table_companies()
         self._create_table_fact_forecasts()
         self._create_table_substances()
         self._create_table_datas()
         self._create_table_fsd_s()
+
+    def _create_tables(self):
+        self._create_dimension_tables()
         self._create_table_measurements()
         self._create_table_day_measurements()
 
@@ -463,16 +592,59 @@ class DBStorageSQLite(DBStorageInterface):
         fsd.db_pk = fsd_id
         return fsd
 
-    def _get_or_create_company(self, day_index) -> Companies:
-        if self.data[day_index].company.db_pk:
-            return self.data[day_index].company
-        company_name = self.data[day_index].company.name
+    def _get_or_create_company(self, company: Companies) -> Companies:
+        if company.db_pk:
+            return company
         sql = f'INSERT INTO {Companies.get_db_name()}(name) VALUES(?);'
-        self.cur.execute(sql, (company_name, ))
+        self.cur.execute(sql, (company.name, ))
         company_id = self.cur.lastrowid
         self.conn.commit()
-        self.data[day_index].company.db_pk = company_id
-        return self.data[day_index].company
+        company.db_pk = company_id
+        return company
+
+    def _copy_dimensions(self, data: list[DayMeasurements]):
+        """
+        Записывает справочники с уже назначенными db_pk под теми же id.
+        Нужно, чтобы несколько БД ссылались на общие справочники.
+        """
+        named_entities = {}
+        fsds = {}
+        for day_measurements in data:
+            company = day_measurements.company
+            named_entities[(company.get_db_name(), company.db_pk)] = company.name
+            for measurement in day_measurements.day_measurements:
+                fsd = measurement.fsd
+                fsds[fsd.db_pk] = fsd
+                for entity in (fsd.fact_forecasts, fsd.substance, fsd.data):
+                    named_entities[(entity.get_db_name(), entity.db_pk)] = entity.name
+        for (table_name, pk), name in named_entities.items():
+            sql = f'INSERT OR IGNORE INTO {table_name}(id, name) VALUES(?, ?);'
+            self.cur.execute(sql, (pk, name))
+        for fsd in fsds.values():
+            sql = f'INSERT OR IGNORE INTO {FSDs.get_db_name()}('
+            sql += 'id, fact_forecasts_id, substance_id, data_id'
+            sql += ') VALUES(?, ?, ?, ?);'
+            self.cur.execute(sql, (fsd.db_pk, fsd.fact_forecasts.db_pk, fsd.substance.db_pk, fsd.data.db_pk))
+        self.conn.commit()
+
+    def _add_with_ids(self, data: list[DayMeasurements]):
+        """Записывает измерения с заранее назначенными db_pk одной транзакцией."""
+        sql = f'INSERT INTO {DayMeasurements.get_db_name()}('
+        sql += 'id, date, company_id, source'
+        sql += ') VALUES(?, ?, ?, ?);'
+        self.cur.executemany(sql, (
+            (d.db_pk, d.date, d.company.db_pk, d.source)
+            for d in data
+        ))
+        sql = f'INSERT INTO {Measurements.get_db_name()}('
+        sql += 'id, quantity, fsd_s_id, day_measurements_id'
+        sql += ') VALUES(?, ?, ?, ?);'
+        self.cur.executemany(sql, (
+            (measurement.db_pk, measurement.quantity, measurement.fsd.db_pk, day_measurements.db_pk)
+            for day_measurements in data
+            for measurement in day_measurements.day_measurements
+        ))
+        self.conn.commit()
 
     def _add_measurement_data(self, measurement: Measurements, day_measurements_id: int):
         fsd = self._get_or_create_fsd(measurement.fsd)
@@ -490,9 +662,9 @@ class DBStorageSQLite(DBStorageInterface):
 
     def _add_day_measurements_data(self, day_index: int):
         date = self.data[day_index].date
-        company = self._get_or_create_company(day_index)
-        sql = f'INSERT INTO {DayMeasurements.get_db_name()}(date, company_id) VALUES(?, ?);'
-        self.cur.execute(sql, (date, company.db_pk))
+        company = self._get_or_create_company(self.data[day_index].company)
+        sql = f'INSERT INTO {DayMeasurements.get_db_name()}(date, company_id, source) VALUES(?, ?, ?);'
+        self.cur.execute(sql, (date, company.db_pk, self.data[day_index].source))
         day_measurements_id = self.cur.lastrowid
         self.conn.commit()
         self.data[day_index].db_pk = day_measurements_id
@@ -509,10 +681,78 @@ class DBStorageSQLite(DBStorageInterface):
         self.data = data
         self._create_tables()
         self._fill_tables_with_data()
+        self._bump_data_version()
         return True
 
-    def read(self) -> list[DayMeasurements]:
-        raise NotImplementedError
+    def _tables_exist(self) -> bool:
+        sql = 'SELECT count(*) FROM sqlite_schema WHERE type="table" AND name=?;'
+        self.cur.execute(sql, (DayMeasurements.get_db_name(), ))
+        return self.cur.fetchone()[0] > 0
+
+    def _read_named_entities(self, entity_class) -> dict[int, Companies | FactForecasts | Substances | Datas]:
+        self.cur.execute(f'SELECT id, name FROM {entity_class.get_db_name()};')
+        return {pk: entity_class(db_pk=pk, name=name) for pk, name in self.cur.fetchall()}
+
+    def _read_fsds(self) -> dict[int, FSDs]:
+        fact_forecasts = self._read_named_entities(FactForecasts)
+        substances = self._read_named_entities(Substances)
+        datas = self._read_named_entities(Datas)
+        self.cur.execute(f'SELECT id, fact_forecasts_id, substance_id, data_id FROM {FSDs.get_db_name()};')
+        return {
+            pk: FSDs(
+                db_pk=pk,
+                fact_forecasts=fact_forecasts[fact_forecasts_id],
+                substance=substances[substance_id],
+                data=datas[data_id]
+            )
+            for pk, fact_forecasts_id, substance_id, data_id in self.cur.fetchall()
+        }
+
+    def iter_read(self, date: datetime.date | None = None) -> Iterator[DayMeasurements]:
+        """
+        Читает измерения из БД по одному дню, при указании date - только за этот день.
+        Строки измерений читаются курсором, упорядоченным по day_measurements_id,
+        поэтому в памяти находятся только справочники и текущий день.
+        Справочники создаются по одному объекту на запись, как при разборе Excel.
+        """
+        if not self._tables_exist():
+            return
+        self._add_column_source()
+        self.conn.commit()
+        fsds = self._read_fsds()
+        companies = self._read_named_entities(Companies)
+        sql = 'SELECT d.id, d.date, d.company_id, d.source, m.id, m.quantity, m.fsd_s_id '
+        sql += f'FROM {DayMeasurements.get_db_name()} d '
+        sql += f'LEFT JOIN {Measurements.get_db_name()} m ON m.day_measurements_id = d.id'
+        params = ()
+        if date is not None:
+            sql += ' WHERE d.date = ?'
+            params = (date, )
+        # Отдельный курсор: self.cur может понадобиться, пока вызывающий обрабатывает день.
+        cur = self.conn.cursor()
+        try:
+            cur.execute(sql + ' ORDER BY d.id, m.id;', params)
+            day_measurements = None
+            for day_measurements_id, day, company_id, source, pk, quantity, fsd_id in cur:
+                if day_measurements is None or day_measurements.db_pk != day_measurements_id:
+                    if day_measurements is not None:
+                        yield day_measurements
+                    day_measurements = DayMeasurements(
+                        db_pk=day_measurements_id, date=day, company=companies[company_id],
+                        day_measurements=[], source=source
+                    )
+                if pk is not None:
+                    day_measurements.day_measurements.append(
+                        Measurements(db_pk=pk, fsd=fsds[fsd_id], quantity=quantity)
+                    )
+            if day_measurements is not None:
+                yield day_measurements
+        finally:
+            cur.close()
+
+    def read(self, date: datetime.date | None = None) -> list[DayMeasurements]:
+        """Читает измерения из БД списком, при указании date - только за этот день."""
+        return list(self.iter_read(date=date))
 
     def update(self, data: list[DayMeasurements]) -> bool:
         raise NotImplementedError
@@ -526,15 +766,336 @@ class DBStorageSQLite(DBStorageInterface):
         tables = self.cur.fetchall()
         for table in tables:
             table_name = table[0]
-            if 'SQLITE'.lower() in table_name.lower():
+            if 'SQLITE'.lower() in table_name.lower() or table_name == self.meta_table_name:
                 continue
             sql = f"DROP TABLE IF EXISTS {table_name};"
             self.cur.execute(sql)
             self.conn.commit()
         self.conn.close()
         self._init_connection(foreign_keys=True)
+        self._bump_data_version()
         return True
 
+    def delete_source(self, source: str) -> int:
+        """Удаляет измерения, загруженные из файла source, и возвращает число удаленных дней."""
+        if not self._tables_exist():
+            return 0
+        self._create_tables()
+        sql = f'DELETE FROM {Measurements.get_db_name()} WHERE day_measurements_id IN ('
+        sql += f'SELECT id FROM {DayMeasurements.get_db_name()} WHERE source = ?'
+        sql += ');'
+        self.cur.execute(sql, (source, ))
+        self.cur.execute(f'DELETE FROM {DayMeasurements.get_db_name()} WHERE source = ?;', (source, ))
+        deleted = self.cur.rowcount
+        if deleted:
+            # Версия меняется в той же транзакции, что и удаление.
+            self._bump_data_version()
+        else:
+            self.conn.commit()
+        return deleted
+
+    def delete(self, pk: int) -> bool:
+        raise NotImplementedError
+
+
+def _write_shard(db_name: str, data: list[DayMeasurements]):
+    """
+    Записывает измерения в файл шарда в отдельном процессе.
+    Справочники и сами измерения уже имеют db_pk, назначенные общей БД,
+    и записываются под теми же id.
+    """
+    shard = DBStorageSQLite(db_name)
+    try:
+        shard._create_tables()
+        shard._copy_dimensions(data)
+        shard._add_with_ids(data)
+        shard._bump_data_version()
+    finally:
+        shard.conn.close()
+
+
+def _read_shard(db_name: str, date: datetime.date | None) -> list[DayMeasurements]:
+    shard = DBStorageSQLite(db_name, read_only=True)
+    try:
+        return shard.read(date=date)
+    finally:
+        shard.conn.close()
+
+
+def _sum_shard(db_name: str) -> list[tuple[datetime.date, int, int, float]]:
+    shard = DBStorageSQLite(db_name, read_only=True)
+    try:
+        sql = 'SELECT d.date AS "date [DATE]", f.fact_forecasts_id, f.substance_id, SUM(m.quantity) '
+        sql += f'FROM {Measurements.get_db_name()} m '
+        sql += f'JOIN {DayMeasurements.get_db_name()} d ON d.id = m.day_measurements_id '
+        sql += f'JOIN {FSDs.get_db_name()} f ON f.id = m.fsd_s_id '
+        sql += 'GROUP BY d.date, f.fact_forecasts_id, f.substance_id;'
+        shard.cur.execute(sql)
+        return shard.cur.fetchall()
+    finally:
+        shard.conn.close()
+
+
+class DBStorageShardedSQLite(DBStorageInterface):
+    """
+    Хранит измерения в отдельном файле SQLite на каждый месяц (shard_by='month')
+    или компанию (shard_by='company'). Справочники общие и лежат в dimensions.db,
+    где ищутся по имени, их id копируются в каждый шард, поэтому шард читается
+    как обычная БД DBStorageSQLite. id измерений выдаются общей последовательностью
+    из dimensions.db и уникальны во всех шардах.
+    Шарды записываются параллельно в разных процессах, чтение и агрегаты
+    выполняются по всем шардам и объединяются. Удаление месяца - удаление файла.
+    """
+    shard_by_options = ('month', 'company')
+    dimensions_file_name = 'dimensions.db'
+    id_sequences_table_name = 'idsequences'
+    shard_prefix = 'shard_'
+    shard_extension = '.db'
+
+    dirname: str
+    shard_by: str
+    max_workers: int | None
+    check_same_thread: bool
+    dimensions: DBStorageSQLite
+    dimension_ids: dict[tuple, int]
+    dimension_ids_version: int | None
+
+    def __init__(
+            self,
+            dirname: str,
+            shard_by: str = 'month',
+            max_workers: int | None = None,
+            check_same_thread: bool = True
+    ):
+        """check_same_thread передается подключению к dimensions.db, как в DBStorageSQLite."""
+        if shard_by not in self.shard_by_options:
+            raise ValueError(f'shard_by должен быть одним из: {", ".join(self.shard_by_options)}.')
+        os.makedirs(dirname, exist_ok=True)
+        self.dirname = dirname
+        self.shard_by = shard_by
+        self.max_workers = max_workers
+        self.check_same_thread = check_same_thread
+        self.dimensions = DBStorageSQLite(
+            os.path.join(dirname, self.dimensions_file_name), check_same_thread=check_same_thread
+        )
+        self.dimension_ids = {}
+        self.dimension_ids_version = None
+
+    @property
+    def data_version(self) -> int:
+        return self.dimensions.data_version
+
+    @property
+    def storage_id(self) -> str:
+        return self.dimensions.storage_id
+
+    def _get_db_settings(self):
+        """Не реализовано. Импорт настроек БД из конфига settings.py."""
+        raise NotImplementedError
+
+    def _get_shard_key(self, day_measurements: DayMeasurements) -> str:
+        if self.shard_by == 'month':
+            return day_measurements.date.strftime('%Y-%m')
+        return f'company_{day_measurements.company.db_pk}'
+
+    def _get_shard_path(self, shard_key: str) -> str:
+        return os.path.join(self.dirname, f'{self.shard_prefix}{shard_key}{self.shard_extension}')
+
+    def get_shard_keys(self) -> list[str]:
+        return sorted(
+            file_name[len(self.shard_prefix):-len(self.shard_extension)]
+            for file_name in os.listdir(self.dirname)
+            if file_name.startswith(self.shard_prefix) and file_name.endswith(self.shard_extension)
+        )
+
+    def _get_or_create_dimension(self, table_name: str, columns: tuple[str, ...], values: tuple) -> int:
+        """
+        Ищет запись справочника в общей БД по значениям, а не по db_pk сущности:
+        одна и та же компания из разных файлов должна получить один id.
+        """
+        key = (table_name, values)
+        if key not in self.dimension_ids:
+            condition = ' AND '.join(f'{column} = ?' for column in columns)
+            self.dimensions.cur.execute(f'SELECT MIN(id) FROM {table_name} WHERE {condition};', values)
+            pk = self.dimensions.cur.fetchone()[0]
+            if pk is None:
+                sql = f'INSERT INTO {table_name}({", ".join(columns)}) VALUES({", ".join("?" * len(columns))});'
+                self.dimensions.cur.execute(sql, values)
+                pk = self.dimensions.cur.lastrowid
+            self.dimension_ids[key] = pk
+        return self.dimension_ids[key]
+
+    def _save_named_entity(self, entity: Companies | FactForecasts | Substances | Datas):
+        entity.db_pk = self._get_or_create_dimension(entity.get_db_name(), ('name', ), (entity.name, ))
+
+    def _save_dimensions(self, data: list[DayMeasurements]):
+        """
+        Назначает справочникам db_pk из общей БД до записи шардов.
+        Запомненные id сбрасываются, если после последней записи этого экземпляра
+        версию данных изменил кто-то другой: например, clear() другого экземпляра удалил справочники.
+        """
+        if self.dimensions.data_version != self.dimension_ids_version:
+            self.dimension_ids = {}
+        self.dimensions._create_dimension_tables()
+        for day_measurements in data:
+            self._save_named_entity(day_measurements.company)
+            for measurement in day_measurements.day_measurements:
+                fsd = measurement.fsd
+                for entity in (fsd.fact_forecasts, fsd.substance, fsd.data):
+                    self._save_named_entity(entity)
+                fsd.db_pk = self._get_or_create_dimension(
+                    FSDs.get_db_name(),
+                    ('fact_forecasts_id', 'substance_id', 'data_id'),
+                    (fsd.fact_forecasts.db_pk, fsd.substance.db_pk, fsd.data.db_pk)
+                )
+        self.dimensions.conn.commit()
+
+    def _reserve_ids(self, entity_class, count: int) -> int:
+        """
+        Резервирует count последовательных id в общей БД и возвращает первый.
+        Так id измерений уникальны во всех шардах, а не только внутри файла.
+        """
+        cur = self.dimensions.cur
+        sql = f'CREATE TABLE IF NOT EXISTS {self.id_sequences_table_name}('
+        sql += 'name TEXT PRIMARY KEY,'
+        sql += 'value INTEGER NOT NULL'
+        sql += ');'
+        cur.execute(sql)
+        sql = f'INSERT OR IGNORE INTO {self.id_sequences_table_name}(name, value) VALUES(?, 0);'
+        cur.execute(sql, (entity_class.get_db_name(), ))
+        sql = f'UPDATE {self.id_sequences_table_name} SET value = value + ? WHERE name = ?;'
+        cur.execute(sql, (count, entity_class.get_db_name()))
+        cur.execute(
+            f'SELECT value FROM {self.id_sequences_table_name} WHERE name = ?;', (entity_class.get_db_name(), )
+        )
+        last_id = cur.fetchone()[0]
+        self.dimensions.conn.commit()
+        return last_id - count + 1
+
+    def _assign_ids(self, data: list[DayMeasurements]):
+        day_measurements_id = self._reserve_ids(DayMeasurements, len(data))
+        measurement_id = self._reserve_ids(
+            Measurements, sum(len(day_measurements.day_measurements) for day_measurements in data)
+        )
+        for day_measurements in data:
+            day_measurements.db_pk = day_measurements_id
+            day_measurements_id += 1
+            for measurement in day_measurements.day_measurements:
+                measurement.db_pk = measurement_id
+                measurement_id += 1
+
+    def _split_to_shards(self, data: list[DayMeasurements]) -> dict[str, list[DayMeasurements]]:
+        shards: dict[str, list[DayMeasurements]] = {}
+        for day_measurements in data:
+            shards.setdefault(self._get_shard_key(day_measurements), []).append(day_measurements)
+        return shards
+
+    def add(self, data: None | list[DayMeasurements]) -> bool:
+        if not data:
+            raise MeasurementsAbsentError('Нет измерений для добавления в БД.')
+        self._save_dimensions(data)
+        self._assign_ids(data)
+        shards = self._split_to_shards(data)
+        if len(shards) == 1:
+            shard_key, shard_data = next(iter(shards.items()))
+            _write_shard(self._get_shard_path(shard_key), shard_data)
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = [
+                    executor.submit(_write_shard, self._get_shard_path(shard_key), shard_data)
+                    for shard_key, shard_data in shards.items()
+                ]
+            for future in futures:
+                future.result()
+        self.dimension_ids_version = self.dimensions._bump_data_version()
+        return True
+
+    def _get_read_shard_keys(self, date: datetime.date | None) -> list[str]:
+        shard_keys = self.get_shard_keys()
+        if date is not None and self.shard_by == 'month':
+            shard_keys = [key for key in shard_keys if key == date.strftime('%Y-%m')]
+        return shard_keys
+
+    def read(self, date: datetime.date | None = None) -> list[DayMeasurements]:
+        """
+        Читает все шарды параллельно, при указании date - только за этот день.
+        Справочники в результате общие для всех шардов.
+        """
+        shard_paths = [self._get_shard_path(key) for key in self._get_read_shard_keys(date)]
+        if not shard_paths:
+            return []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            shards_data = list(executor.map(_read_shard, shard_paths, [date] * len(shard_paths)))
+        companies = self.dimensions._read_named_entities(Companies)
+        fsds = self.dimensions._read_fsds()
+        data = []
+        for shard_data in shards_data:
+            for day_measurements in shard_data:
+                day_measurements.company = companies[day_measurements.company.db_pk]
+                for measurement in day_measurements.day_measurements:
+                    measurement.fsd = fsds[measurement.fsd.db_pk]
+                data.append(day_measurements)
+        data.sort(key=lambda day_measurements: day_measurements.date)
+        return data
+
+    def get_totals(self) -> dict[tuple[datetime.date, str, str], float]:
+        """
+        Сумма quantity по дате, факту/прогнозу и веществу.
+        Считается в каждом шарде параллельно, частичные суммы складываются.
+        """
+        shard_paths = [self._get_shard_path(key) for key in self.get_shard_keys()]
+        if not shard_paths:
+            # Пустая папка или после clear(): таблиц справочников может еще не быть.
+            return {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            shards_sums = list(executor.map(_sum_shard, shard_paths))
+        fact_forecasts = self.dimensions._read_named_entities(FactForecasts)
+        substances = self.dimensions._read_named_entities(Substances)
+        totals: dict[tuple[datetime.date, str, str], float] = {}
+        for shard_sums in shards_sums:
+            for date, fact_forecasts_id, substance_id, quantity in shard_sums:
+                key = (date, fact_forecasts[fact_forecasts_id].name, substances[substance_id].name)
+                totals[key] = totals.get(key, 0.0) + quantity
+        return dict(sorted(totals.items()))
+
+    def update(self, data: list[DayMeasurements]) -> bool:
+        raise NotImplementedError
+
+    def drop_shard(self, shard_key: str) -> bool:
+        """Удаляет шард целиком удалением файла. Возвращает False, если шарда нет."""
+        shard_path = self._get_shard_path(shard_key)
+        if not os.path.isfile(shard_path):
+            return False
+        os.remove(shard_path)
+        self.dimensions._bump_data_version()
+        return True
+
+    def drop_month(self, year: int, month: int) -> bool:
+        if self.shard_by != 'month':
+            raise ValueError('Удаление месяца доступно только при shard_by="month".')
+        return self.drop_shard(datetime.date(year, month, 1).strftime('%Y-%m'))
+
+    def clear(self) -> bool:
+        """Удаляет все шарды и таблицы справочников."""
+        for shard_key in self.get_shard_keys():
+            os.remove(self._get_shard_path(shard_key))
+        self.dimension_ids = {}
+        self.dimension_ids_version = None
+        return self.dimensions.clear()
+
+    def delete_source(self, source: str) -> int:
+        """Удаляет измерения, загруженные из файла source, во всех шардах."""
+        deleted = 0
+        for shard_key in self.get_shard_keys():
+            shard = DBStorageSQLite(self._get_shard_path(shard_key))
+            try:
+                deleted += shard.delete_source(source)
+            finally:
+                shard.conn.close()
+        if deleted:
+            self.dimensions._bump_data_version()
+        return deleted
+
     def delete(self, pk: int) -> bool:
         raise NotImplementedError
 
@@ -542,6 +1103,14 @@ class DBStorageSQLite(DBStorageInterface):
 class DBStoragePostgreSQL(DBStorageInterface):
     """Не реализовано. Пример реализации интерфейса работы с другой БД."""
 
+    @property
+    def data_version(self) -> int:
+        raise NotImplementedError
+
+    @property
+    def storage_id(self) -> str:
+        raise NotImplementedError
+
     def _get_db_settings(self):
         """Не реализовано. Импорт настроек БД из конфига settings.py."""
         raise NotImplementedError
@@ -561,3 +1130,6 @@ class DBStoragePostgreSQL(DBStorageInterface):
 
     def delete(self, pk: int) -> bool:
         raise NotImplementedError
+
+    def delete_source(self, source: str) -> int:
+        raise NotImplementedError
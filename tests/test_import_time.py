@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ('cli', 'storage', 'analytics', 'exporters', 'cache')
+# С запасом на медленные машины CI: без ленивого импорта openpyxl время было в разы больше.
+IMPORT_BUDGET_MS = 500
+
+
+def _import_in_subprocess(modules: tuple[str, ...]) -> dict:
+    code = (
+        'import json, sys, time\n'
+        'start = time.perf_counter()\n'
+        f'import {", ".join(modules)}\n'
+        'elapsed = (time.perf_counter() - start) * 1000\n'
+        "print(json.dumps({'elapsed': elapsed, 'openpyxl': 'openpyxl' in sys.modules}))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=PACKAGE_DIR
+    ).stdout
+    return json.loads(output)
+
+
+def test_import_does_not_load_openpyxl():
+    result = _import_in_subprocess(MODULES)
+    assert not result['openpyxl']
+
+
+def test_import_time_budget():
+    # Первый запуск может компилировать .pyc, поэтому берется лучший из нескольких.
+    elapsed = min(_import_in_subprocess(MODULES)['elapsed'] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET_MS, f'Импорт {", ".join(MODULES)} занял {elapsed:.1f} мс'